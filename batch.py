@@ -0,0 +1,214 @@
+"""
+batch.py
+
+Non-interactive batch mode: reads one command per line (JSONL or plain text)
+and runs it against StoreService without rendering the menu.
+
+Text:   add_item 1 2          start_order "Ana Maria"      add_items 1:2,3:5
+JSONL:  {"cmd": "add_item", "product": 1, "qty": 2}
+        {"cmd": "add_items", "lines": [[1, 2], [3, 5]]}
+
+Product and cart line numbers are 1-based, as in the interactive menu.
+Every command produces one JSON result line on the output stream.
+Persistence is deferred and flushed every `flush_every` commands and at the end.
+"""
+from __future__ import annotations
+
+import contextlib
+import inspect
+import io
+import json
+import shlex
+import sys
+from typing import Any, Callable, Dict, List, TextIO, Tuple
+
+from services.store_service import StoreService
+
+Param = Tuple[str, Callable[[Any], Any]]
+
+
+def _catalog(store: StoreService) -> List[Dict[str, Any]]:
+    return [p.to_dict() for p in store.list_catalog()]
+
+
+def _int(value: Any) -> int:
+    """Integer argument: a JSON integer or a text token. Bools and floats are rejected, not truncated."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"expected an integer, got {value!r}")
+    return int(value)
+
+
+def _str(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"expected a string, got {value!r}")
+    return value
+
+
+def _parse_lines(value: Any) -> List[Tuple[int, int]]:
+    """Accepts [[product, qty], ...] (JSONL) or "product:qty,product:qty" (text)."""
+    if isinstance(value, str):
+        value = [pair.split(":") for pair in value.split(",") if pair]
+    if not isinstance(value, list):
+        raise ValueError(f"expected a list of [product, qty] pairs, got {value!r}")
+
+    lines: List[Tuple[int, int]] = []
+    for pair in value:
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            raise ValueError(f"expected a [product, qty] pair, got {pair!r}")
+        lines.append((_int(pair[0]), _int(pair[1])))
+    return lines
+
+
+def _add_items(store: StoreService, lines: List[Tuple[int, int]]) -> bool:
+    return store.add_items_by_index([(product - 1, qty) for product, qty in lines])
+
+
+def _remove_item(store: StoreService, line: int, qty: int | None = None) -> bool:
+    return store.remove_item_from_cart(line - 1, qty)
+
+
+def _low_stock(store: StoreService, limit: int = 10) -> List[Dict[str, Any]]:
+    return [
+        {"name": p.name, "stock": p.stock, "reorder_level": p.reorder_level}
+        for p in store.low_stock_products(limit)
+    ]
+
+
+def _history(store: StoreService, limit: int = 10) -> List[Dict[str, Any]]:
+    return store.order_history_latest(limit=limit)
+
+
+# name -> (handler, [(param, converter)]). Trailing params may be omitted when the handler has defaults.
+COMMANDS: Dict[str, Tuple[Callable[..., Any], List[Param]]] = {
+    "catalog": (_catalog, []),
+    "start_order": (lambda store, customer: store.start_order(customer), [("customer", _str)]),
+    "add_item": (
+        lambda store, product, qty: store.add_item_by_index(product - 1, qty),
+        [("product", _int), ("qty", _int)],
+    ),
+    "add_items": (_add_items, [("lines", _parse_lines)]),
+    "remove_item": (_remove_item, [("line", _int), ("qty", _int)]),
+    "cancel_order": (lambda store: store.cancel_current_order(), []),
+    "checkout": (lambda store: store.checkout_current_order(), []),
+    "restock": (
+        lambda store, product, qty: store.restock_by_index(product - 1, qty),
+        [("product", _int), ("qty", _int)],
+    ),
+    "replenish": (lambda store, path: store.replenish_from_file(path) > 0, [("path", _str)]),
+    "low_stock": (_low_stock, [("limit", _int)]),
+    "history": (_history, [("limit", _int)]),
+    "flush": (lambda store: store.flush(), []),
+}
+
+
+def parse_command(raw: str) -> Tuple[str, List[Any]]:
+    """Turns one input line into (command name, typed positional args)."""
+    if raw.startswith("{"):
+        data = json.loads(raw)
+        if not isinstance(data, dict) or not isinstance(data.get("cmd"), str):
+            raise ValueError('JSON commands need a string "cmd" field')
+        name = data["cmd"]
+    else:
+        tokens = shlex.split(raw)
+        name, data = tokens[0], None
+
+    if name not in COMMANDS:
+        raise ValueError(f"Unknown command: {name}")
+    handler, params = COMMANDS[name]
+
+    if data is None:
+        values = tokens[1:]
+    elif "args" in data:
+        values = list(data["args"])
+    else:
+        values = [data[param] for param, _ in params if param in data]
+
+    if len(values) > len(params):
+        raise ValueError(f"{name} takes at most {len(params)} argument(s)")
+
+    args = [convert(value) for value, (_, convert) in zip(values, params)]
+    try:
+        inspect.signature(handler).bind(None, *args)
+    except TypeError:
+        names = ", ".join(param for param, _ in params) or "no arguments"
+        raise ValueError(f"{name} expects: {names}") from None
+    return name, args
+
+
+def _flush(store: StoreService, out: TextIO) -> bool:
+    """Automatic flush. Messages go to stderr; a failed flush also gets a result line on `out`."""
+    messages = io.StringIO()
+    with contextlib.redirect_stdout(messages):
+        ok = store.flush()
+
+    lines = [m for m in messages.getvalue().splitlines() if m.strip()]
+    for line in lines:
+        print(line, file=sys.stderr)
+    if not ok:
+        result = {"cmd": "flush", "auto": True, "ok": False, "messages": lines}
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return ok
+
+
+def _direct(command: str, func: Callable[..., Any], *args: Any) -> Any:
+    return func(*args)
+
+
+def run_batch(
+    store: StoreService,
+    source: TextIO,
+    out: TextIO,
+    flush_every: int = 0,
+    run: Callable[..., Any] = _direct,
+) -> int:
+    """
+    Executes every command from `source` and writes one JSON result per command to `out`.
+    flush_every <= 0 flushes only once, at the end. Returns the number of failed commands.
+    `run` wraps each handler call, e.g. CommandProfiler.call to profile the batch.
+    """
+    store.defer_persistence = True
+    failures = 0
+    executed = 0
+
+    try:
+        for line_no, raw in enumerate(source, start=1):
+            raw = raw.strip()
+            if not raw or raw.startswith("#"):
+                continue
+
+            result: Dict[str, Any] = {"line": line_no}
+            messages = io.StringIO()
+            try:
+                name, args = parse_command(raw)
+            except ValueError as e:  # includes json.JSONDecodeError
+                name, args = None, []
+                result["ok"] = False
+                result["error"] = str(e)
+
+            if name is not None:
+                result["cmd"] = name
+                try:
+                    with contextlib.redirect_stdout(messages):
+                        value = run(name, COMMANDS[name][0], store, *args)
+                    result["ok"] = value is not False
+                    if value is not None and not isinstance(value, bool):
+                        result["result"] = value
+                except Exception as e:
+                    # Arguments were already validated: this is a bug, not bad input.
+                    result["ok"] = False
+                    result["internal_error"] = f"{type(e).__name__}: {e}"
+
+            result["messages"] = [m for m in messages.getvalue().splitlines() if m.strip()]
+            if not result["ok"]:
+                failures += 1
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+            executed += 1
+            if flush_every > 0 and executed % flush_every == 0 and not _flush(store, out):
+                failures += 1
+    finally:
+        if not _flush(store, out):
+            failures += 1
+        store.defer_persistence = False
+
+    return failures
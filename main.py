@@ -1,19 +1,99 @@
+import argparse
+import contextlib
 import os
 import sys
+from datetime import datetime, timedelta, timezone
 
+from batch import run_batch
 from repositories.inventory_repo import InventoryRepository
+from repositories.order_archive_repo import OrderArchiveRepository
+from repositories.orders_index_repo import OrdersIndexRepository
 from repositories.orders_repo import OrdersRepository
+from services.profiler import aggregate_session, latest_session, profiler_from_env
 from services.store_service import StoreService
 
 
+def print_orders(orders) -> None:
+    for i, order in enumerate(orders, start=1):
+        name = order.get("customer_name", "Unknown")
+        status = order.get("status", "Unknown")
+        total = float(order.get("total", 0.0))
+        when = order.get("finished_at_utc", "Unknown time")
+        print(f"{i}. {name} | {status} | Total: ${total:.2f} | {when}")
+
+
+def parse_day(raw: str) -> datetime:
+    return datetime.strptime(raw, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="PyStore CLI")
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="profile every store command into DIR (or set PYSTORE_PROFILE)",
+    )
+    parser.add_argument(
+        "--profile-report",
+        metavar="DIR",
+        help="aggregate a profiling session (or the newest session under DIR) and exit",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="run commands (JSONL or text, one per line) from FILE, or '-' for stdin, and exit",
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="in batch mode, persist every N commands (default: once at the end)",
+    )
+    return parser.parse_args(argv)
+
+
+def run_batch_mode(store: StoreService, args: argparse.Namespace) -> int:
+    """Returns the process exit code. stdout carries only the JSONL result stream."""
+    if args.batch == "-":
+        source = sys.stdin
+    else:
+        try:
+            source = open(args.batch, "r", encoding="utf-8")
+        except OSError as e:
+            print(f"❌ Cannot read batch file: {e}", file=sys.stderr)
+            return 2
+
+    with source:
+        # Profiler and catalog messages go to stderr, like everything that is not a result line.
+        with contextlib.redirect_stdout(sys.stderr):
+            run = profiler_from_env(args.profile).call
+            run("bootstrap_catalog", store.bootstrap_catalog)
+
+        failures = run_batch(store, source, sys.stdout, args.flush_every, run=run)
+
+    return 1 if failures else 0
+
+
 def main() -> None:
+    args = parse_args()
+    if args.profile_report:
+        print(aggregate_session(latest_session(args.profile_report)))
+        return
+
     base_dir = os.path.dirname(os.path.abspath(__file__))
 
     inventory_repo = InventoryRepository(base_dir)
     orders_repo = OrdersRepository(base_dir)
-    store = StoreService(inventory_repo, orders_repo)
+    archive_repo = OrderArchiveRepository(base_dir)
+    index_repo = OrdersIndexRepository(base_dir)
+    store = StoreService(inventory_repo, orders_repo, archive_repo, index_repo)
+    if args.batch:
+        sys.exit(run_batch_mode(store, args))
 
-    store.bootstrap_catalog()
+    run = profiler_from_env(args.profile).call
+
+    run("bootstrap_catalog", store.bootstrap_catalog)
 
     while True:
         print("\n" + "=" * 34)
@@ -27,47 +107,54 @@ def main() -> None:
         print("6. Cancel Order")
         print("7. Finish Order (Checkout)")
         print("8. View Order History")
+        print("9. Orders by Date Range")
+        print("10. Archive Old Orders")
+        print("11. Orders by Customer")
+        print("12. Orders by Product")
+        print("13. Rebuild Order Indexes")
+        print("14. Low Stock Report")
+        print("15. Replenish from Purchase Order")
         print("0. Exit")
 
         option = input("Option: ").strip()
 
         if option == "1":
             print("\n--- 📦 Product Catalog ---")
-            for i, product in enumerate(store.list_catalog(), start=1):
+            for i, product in enumerate(run("list_catalog", store.list_catalog), start=1):
                 print(f"{i}. {product}")
 
         elif option == "2":
             name = input("Enter customer name: ").strip()
-            store.start_order(name)
+            run("start_order", store.start_order, name)
 
         elif option == "3":
             print("\n--- 📦 Product Catalog ---")
-            for i, product in enumerate(store.list_catalog(), start=1):
+            for i, product in enumerate(run("list_catalog", store.list_catalog), start=1):
                 print(f"{i}. {product}")
 
             try:
                 choice = int(input("\nProduct number: ")) - 1
                 qty = int(input("Quantity: "))
-                store.add_item_by_index(choice, qty)
+                run("add_item_by_index", store.add_item_by_index, choice, qty)
             except ValueError:
                 print("❌ Enter only numbers.")
 
         elif option == "4":
             print("\n--- 🛒 Current Cart ---")
-            store.show_cart()
+            run("show_cart", store.show_cart)
 
         elif option == "5":
             print("\n--- 🗑️ Remove Item ---")
-            store.show_cart()
+            run("show_cart", store.show_cart)
 
             try:
                 idx = int(input("\nCart item number to remove: ")) - 1
                 qty_raw = input("Quantity to remove (ENTER = remove whole line): ").strip()
 
                 if qty_raw == "":
-                    store.remove_item_from_cart(idx, None)
+                    run("remove_item_from_cart", store.remove_item_from_cart, idx, None)
                 else:
-                    store.remove_item_from_cart(idx, int(qty_raw))
+                    run("remove_item_from_cart", store.remove_item_from_cart, idx, int(qty_raw))
 
             except ValueError:
                 print("❌ Enter only numbers.")
@@ -75,26 +162,72 @@ def main() -> None:
         elif option == "6":
             confirm = input("Cancel current order? (y/n): ").strip().lower()
             if confirm == "y":
-                store.cancel_current_order()
+                run("cancel_current_order", store.cancel_current_order)
             else:
                 print("ℹ️ Cancel aborted.")
 
         elif option == "7":
-            store.checkout_current_order()
+            run("checkout_current_order", store.checkout_current_order)
 
         elif option == "8":
-            orders = store.order_history_latest(limit=10)
+            orders = run("order_history_latest", store.order_history_latest, limit=10)
             if not orders:
                 print("ℹ️ No orders in history yet.")
                 continue
 
             print("\n--- 🧾 Order History (latest first) ---")
-            for i, order in enumerate(orders, start=1):
-                name = order.get("customer_name", "Unknown")
-                status = order.get("status", "Unknown")
-                total = float(order.get("total", 0.0))
-                when = order.get("finished_at_utc", "Unknown time")
-                print(f"{i}. {name} | {status} | Total: ${total:.2f} | {when}")
+            print_orders(orders)
+
+        elif option == "9":
+            try:
+                start = parse_day(input("From (YYYY-MM-DD): ").strip())
+                end = parse_day(input("To (YYYY-MM-DD, inclusive): ").strip()) + timedelta(days=1)
+            except ValueError:
+                print("❌ Dates must use the YYYY-MM-DD format.")
+                continue
+
+            orders = run("orders_between", store.orders_between, start, end)
+            if not orders:
+                print("ℹ️ No orders in that range.")
+                continue
+
+            print("\n--- 🧾 Orders in Range ---")
+            print_orders(orders)
+
+        elif option == "10":
+            run("archive_closed_orders", store.archive_closed_orders)
+
+        elif option in ("11", "12"):
+            if option == "11":
+                name = input("Customer name: ").strip()
+                orders = run("orders_for_customer", store.orders_for_customer, name)
+            else:
+                name = input("Product name: ").strip()
+                orders = run("orders_containing_product", store.orders_containing_product, name)
+
+            if not orders:
+                print(f"ℹ️ No orders found for {name}.")
+                continue
+
+            print(f"\n--- 🧾 Orders for {name} ---")
+            print_orders(orders)
+
+        elif option == "13":
+            run("rebuild_order_indexes", store.rebuild_order_indexes)
+
+        elif option == "14":
+            products = run("low_stock_products", store.low_stock_products, limit=20)
+            if not products:
+                print("✅ No products below their reorder level.")
+                continue
+
+            print("\n--- ⚠️ Low Stock (most urgent first) ---")
+            for i, product in enumerate(products, start=1):
+                print(f"{i}. {product.name} | Stock: {product.stock} | Reorder at: {product.reorder_level}")
+
+        elif option == "15":
+            path = input("Purchase order file (.csv or .json): ").strip()
+            run("replenish_from_file", store.replenish_from_file, path)
 
         elif option == "0":
             print("Exiting... Come back soon! 👋")
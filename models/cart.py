@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import List, Optional, Dict, Any
+from itertools import islice
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 
 from models.product import Product
 
@@ -36,89 +37,145 @@ class CartItem:
         )
 
 
+def _is_quantity(value: object) -> bool:
+    # bool is a subclass of int, but True/False are never meaningful quantities.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
 class Cart:
-    """Shopping cart. (Current behavior: updates stock immediately)."""
+    """
+    Shopping cart. (Current behavior: updates stock immediately).
+    Lines are kept in an insertion-ordered dict keyed by product identity,
+    so adding, merging and removing a product's line is O(1).
+    """
 
     def __init__(self) -> None:
-        self.items: List[CartItem] = []
+        self._lines: Dict[Product, CartItem] = {}
+
+    @property
+    def items(self) -> List[CartItem]:
+        return list(self._lines.values())
+
+    def __len__(self) -> int:
+        return len(self._lines)
 
     def is_empty(self) -> bool:
-        return len(self.items) == 0
+        return not self._lines
 
     @property
     def total(self) -> float:
-        return sum(item.total for item in self.items)
+        return sum(item.total for item in self._lines.values())
+
+    def _reserve(self, product: Product, quantity: int) -> None:
+        item = self._lines.get(product)
+        if item is None:
+            self._lines[product] = CartItem(product, quantity)
+        else:
+            item.quantity += quantity
+        product -= quantity
 
-    def add_item(self, product: Product, quantity: int) -> None:
-        if not isinstance(quantity, int):
+    def add_item(self, product: Product, quantity: int) -> bool:
+        if not _is_quantity(quantity):
             print("❌ Quantity must be an integer.")
-            return
+            return False
         if quantity <= 0:
             print("❌ Quantity must be positive.")
-            return
+            return False
         if product.stock < quantity:
             print(f"❌ Stock unavailable for {product.name}. Available: {product.stock}")
-            return
+            return False
 
-        for item in self.items:
-            if item.product == product:
-                item.quantity += quantity
-                product -= quantity
-                print(f"✅ Added {quantity}x {product.name} to the cart.")
-                return
-
-        self.items.append(CartItem(product, quantity))
-        product -= quantity
+        self._reserve(product, quantity)
         print(f"✅ Added {quantity}x {product.name} to the cart.")
-
-    def remove_item(self, item_index: int, quantity: Optional[int] = None) -> None:
-        if not (0 <= item_index < len(self.items)):
-            print("❌ Invalid cart item number.")
-            return
-
-        item = self.items[item_index]
+        return True
+
+    def add_items(self, lines: Iterable[Tuple[Product, int]]) -> bool:
+        """
+        Adds many lines in one pass. Quantities for the same product are merged.
+        All lines are validated first: if any is invalid nothing is reserved.
+        """
+        requested: Dict[Product, int] = {}
+        for product, quantity in lines:
+            if not _is_quantity(quantity):
+                print(f"❌ Quantity for {product.name} must be an integer.")
+                return False
+            if quantity <= 0:
+                print(f"❌ Quantity for {product.name} must be positive.")
+                return False
+            requested[product] = requested.get(product, 0) + quantity
+
+        short = [p for p, quantity in requested.items() if p.stock < quantity]
+        if short:
+            for product in short:
+                print(f"❌ Stock unavailable for {product.name}. Available: {product.stock}")
+            return False
+
+        for product, quantity in requested.items():
+            self._reserve(product, quantity)
+
+        print(f"✅ Added {len(requested)} product line(s) to the cart.")
+        return True
+
+    def remove_product(self, product: Product, quantity: Optional[int] = None) -> bool:
+        item = self._lines.get(product)
+        if item is None:
+            print(f"❌ {product.name} is not in the cart.")
+            return False
 
         if quantity is None:
             item.product += item.quantity
-            removed_name = item.product.name
-            removed_qty = item.quantity
-            self.items.pop(item_index)
-            print(f"🗑️ Removed {removed_qty}x {removed_name} (line removed).")
-            return
+            del self._lines[product]
+            print(f"🗑️ Removed {item.quantity}x {item.product.name} (line removed).")
+            return True
 
-        if not isinstance(quantity, int):
+        if not _is_quantity(quantity):
             print("❌ Quantity must be an integer.")
-            return
+            return False
         if quantity <= 0:
             print("❌ Quantity must be positive.")
-            return
+            return False
         if quantity > item.quantity:
             print(f"❌ You only have {item.quantity} of {item.product.name} in the cart.")
-            return
+            return False
 
         item.product += quantity
         item.quantity -= quantity
         print(f"🗑️ Removed {quantity}x {item.product.name} from the cart.")
 
         if item.quantity == 0:
-            self.items.pop(item_index)
+            del self._lines[product]
             print("ℹ️ Item quantity reached 0, line removed.")
+        return True
+
+    def remove_item(self, item_index: int, quantity: Optional[int] = None) -> bool:
+        """Removes by cart line number (0-based), as shown in summary()."""
+        if not (0 <= item_index < len(self._lines)):
+            print("❌ Invalid cart item number.")
+            return False
+
+        product = next(islice(self._lines, item_index, None))
+        return self.remove_product(product, quantity)
 
     def clear(self, restock: bool = True) -> None:
         if restock:
-            for item in self.items:
+            for item in self._lines.values():
                 item.product += item.quantity
-        self.items.clear()
+        self._lines.clear()
 
-    def summary(self) -> str:
+    def summary(self, limit: Optional[int] = None) -> str:
+        """Cart listing. With `limit`, only the first `limit` lines are rendered."""
         lines: List[str] = []
         lines.append("-" * 50)
 
         if self.is_empty():
             lines.append("🛒 Cart is empty.")
         else:
-            for idx, item in enumerate(self.items, start=1):
+            shown = self._lines.values() if limit is None else islice(self._lines.values(), limit)
+            for idx, item in enumerate(shown, start=1):
                 lines.append(f"{idx}. {item}")
+            hidden = len(self._lines) - (len(lines) - 1)
+            if hidden > 0:
+                lines.append(f"... and {hidden} more line(s).")
             lines.append("-" * 50)
             lines.append(f"TOTAL: ${self.total:.2f}")
 
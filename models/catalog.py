@@ -1,22 +1,37 @@
 from __future__ import annotations
 
-from typing import List, Iterator
+from typing import Dict, List, Iterator, Optional
 
-from models.product import Product
+from models.product import Product, name_key
+from models.stock_index import StockIndex
 
 
 class Catalog:
     """In-memory catalog (no persistence here)."""
 
     def __init__(self, products: List[Product] | None = None) -> None:
-        self._products: List[Product] = products or []
+        self._products: List[Product] = []
+        self._by_name: Dict[str, Product] = {}
+        self.stock_index = StockIndex()
+        self.set_products(products or [])
 
     def set_products(self, products: List[Product]) -> None:
+        for product in self._products:
+            self.stock_index.untrack(product)
+
         self._products = products
+        self._by_name = {name_key(product.name): product for product in products}
+        self.stock_index = StockIndex(products)
 
     def get(self, index: int) -> Product:
         return self._products[index]
 
+    def find(self, name: str) -> Optional[Product]:
+        return self._by_name.get(name_key(name))
+
+    def low_stock(self, limit: int = 10) -> List[Product]:
+        return self.stock_index.low_stock(limit)
+
     def __len__(self) -> int:
         return len(self._products)
 
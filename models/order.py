@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, Optional
 from datetime import datetime, timezone
 
 from models.cart import Cart
@@ -10,6 +11,7 @@ class Order:
     """Order lifecycle/status + owns a cart."""
 
     def __init__(self, customer_name: str):
+        self.order_id = uuid.uuid4().hex
         self.customer_name = customer_name
         self.cart = Cart()
         self.status = "OPEN"
@@ -34,17 +36,18 @@ class Order:
         self.status = "PAID"
         print(f"🎉 Order finished for {self.customer_name}! Total to pay: ${self.cart.total:.2f}")
 
-    def summary(self) -> str:
+    def summary(self, limit: Optional[int] = None) -> str:
         return "\n".join(
             [
                 f"Customer: {self.customer_name}",
                 f"Status: {self.status}",
-                self.cart.summary(),
+                self.cart.summary(limit),
             ]
         )
 
     def to_record(self) -> Dict[str, Any]:
         return {
+            "order_id": self.order_id,
             "customer_name": self.customer_name,
             "status": self.status,
             "created_at_utc": self.created_at,
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_REORDER_LEVEL = 5
+
+
+def name_key(name: str) -> str:
+    """Normalized product/customer name used for lookups (case- and whitespace-insensitive)."""
+    return name.strip().casefold()
 
 
 class Product:
@@ -10,6 +17,26 @@ class Product:
         self.name = name
         self.price = price if price > 0 else 0.0
         self._stock = stock if stock >= 0 else 0
+        self._reorder_level = DEFAULT_REORDER_LEVEL
+        # Set by the catalog's stock index; called after every stock/threshold change.
+        self.on_stock_change: Optional[Callable[["Product"], None]] = None
+
+    def _notify_stock_change(self) -> None:
+        if self.on_stock_change is not None:
+            self.on_stock_change(self)
+
+    @property
+    def reorder_level(self) -> int:
+        """Restock threshold: the product is low on stock when stock <= reorder_level."""
+        return self._reorder_level
+
+    @reorder_level.setter
+    def reorder_level(self, value: int) -> None:
+        if not isinstance(value, int) or value < 0:
+            print("❌ Reorder level must be a non-negative integer.")
+            return
+        self._reorder_level = value
+        self._notify_stock_change()
 
     @property
     def stock(self) -> int:
@@ -24,6 +51,7 @@ class Product:
             print("❌ Stock cannot be negative.")
             return
         self._stock = value
+        self._notify_stock_change()
 
     def __iadd__(self, amount: int) -> "Product":
         if not isinstance(amount, int):
@@ -52,7 +80,10 @@ class Product:
         return f"Product: {self.name} | Price: ${self.price:.2f} | Stock: {self.stock}"
 
     def to_dict(self) -> dict:
-        return {"type": "generic", "name": self.name, "price": self.price, "stock": self.stock}
+        data = {"type": "generic", "name": self.name, "price": self.price, "stock": self.stock}
+        if self.reorder_level != DEFAULT_REORDER_LEVEL:
+            data["reorder_level"] = self.reorder_level
+        return data
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> "Product":
@@ -66,11 +97,14 @@ class Product:
         stock = int(data["stock"])
 
         if type_ == "physical":
-            return PhysicalProduct(name, price, stock, float(data["weight"]))
-        if type_ == "digital":
-            return DigitalProduct(name, price, stock, float(data["size_mb"]))
-
-        return Product(name, price, stock)
+            product: Product = PhysicalProduct(name, price, stock, float(data["weight"]))
+        elif type_ == "digital":
+            product = DigitalProduct(name, price, stock, float(data["size_mb"]))
+        else:
+            product = Product(name, price, stock)
+
+        product.reorder_level = int(data.get("reorder_level", DEFAULT_REORDER_LEVEL))
+        return product
 
 
 class PhysicalProduct(Product):
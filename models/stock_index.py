@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import Dict, Iterable, List, Tuple
+
+from models.product import Product
+
+
+class StockIndex:
+    """
+    Min-heap of products keyed by stock - reorder_level (most urgent first).
+    Products report every stock change; old heap entries are invalidated lazily,
+    so updates cost O(log n) and low_stock(k) costs O(k log n) amortized.
+    """
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        self._heap: List[Tuple[int, int, Product]] = []
+        self._latest: Dict[Product, int] = {}
+        self._seq = itertools.count()
+        for product in products:
+            self.track(product)
+
+    def track(self, product: Product) -> None:
+        product.on_stock_change = self.update
+        self.update(product)
+
+    def untrack(self, product: Product) -> None:
+        if product.on_stock_change == self.update:
+            product.on_stock_change = None
+        self._latest.pop(product, None)
+
+    def update(self, product: Product) -> None:
+        seq = next(self._seq)
+        self._latest[product] = seq
+        heapq.heappush(self._heap, (product.stock - product.reorder_level, seq, product))
+
+        # Keep stale entries from piling up when stock churns a lot.
+        if len(self._heap) > 2 * len(self._latest) + 64:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if self._latest.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def low_stock(self, limit: int) -> List[Product]:
+        """Up to `limit` products with stock <= reorder_level, most urgent first."""
+        found: List[Tuple[int, int, Product]] = []
+
+        while self._heap and len(found) < limit:
+            entry = self._heap[0]
+            if self._latest.get(entry[2]) != entry[1]:
+                heapq.heappop(self._heap)
+                continue
+            if entry[0] > 0:
+                break
+            found.append(heapq.heappop(self._heap))
+
+        for entry in found:
+            heapq.heappush(self._heap, entry)
+
+        return [entry[2] for entry in found]
@@ -42,14 +42,16 @@ class InventoryRepository:
             print(f"❌ Error reading inventory: {e}")
             return []
 
-    def save(self, products: List[Product]) -> None:
+    def save(self, products: List[Product]) -> bool:
         data_list = [p.to_dict() for p in products]
         try:
             with open(self.inventory_file, "w", encoding="utf-8") as f:
                 json.dump(data_list, f, indent=4)
             print("💾 Inventory saved successfully!")
+            return True
         except (OSError, TypeError) as e:
             print(f"❌ Error saving inventory: {e}")
+            return False
 
 
 def default_seed_products() -> List[Product]:
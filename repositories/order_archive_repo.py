@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+
+def parse_utc(value: str) -> datetime:
+    """Parses an ISO timestamp from an order record. Naive values are treated as UTC."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def month_key(moment: datetime) -> str:
+    return f"{moment.year:04d}-{moment.month:02d}"
+
+
+def _month_number(key: str) -> int:
+    year, month = key.split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+class OrderArchiveRepository:
+    """
+    Reads/writes per-month order partitions under orders_archive/.
+    A small manifest keeps min/max finished_at_utc and counts per partition,
+    so range queries only open the partitions that overlap. No business rules here.
+    """
+
+    def __init__(self, base_dir: str, hot_months: int = 1) -> None:
+        self.archive_dir = os.path.join(base_dir, "orders_archive")
+        self.manifest_file = os.path.join(self.archive_dir, "manifest.json")
+        # Partitions newer than this many months (besides the current one) stay uncompressed.
+        self.hot_months = hot_months
+
+    def _partition_file(self, key: str, compressed: bool) -> str:
+        name = f"orders-{key}.json.gz" if compressed else f"orders-{key}.json"
+        return os.path.join(self.archive_dir, name)
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.manifest_file):
+            return {}
+
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"❌ Error reading archive manifest: {e}")
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        with open(self.manifest_file, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(manifest.items())), f, indent=4)
+
+    def load_partition(self, key: str) -> List[Dict[str, Any]]:
+        entry = self.load_manifest().get(key)
+        if entry is None:
+            return []
+        return self._read_partition(key, bool(entry.get("compressed")))
+
+    def _read_partition(self, key: str, compressed: bool) -> List[Dict[str, Any]]:
+        if not os.path.exists(self._partition_file(key, compressed)):
+            return []
+
+        try:
+            return self._read_partition_strict(key, compressed)
+        except (OSError, EOFError, ValueError) as e:
+            print(f"❌ Error reading archive partition {key}: {e}")
+            return []
+
+    def _read_partition_strict(self, key: str, compressed: bool) -> List[Dict[str, Any]]:
+        """Read path for read-modify-write: raises instead of returning [] so nothing gets overwritten."""
+        opener = gzip.open if compressed else open
+        with opener(self._partition_file(key, compressed), "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"partition {key} is not a list")
+        return data
+
+    def _write_partition(self, key: str, records: List[Dict[str, Any]], compressed: bool) -> None:
+        if compressed:
+            with gzip.open(self._partition_file(key, True), "wt", encoding="utf-8") as f:
+                json.dump(records, f, separators=(",", ":"))
+        else:
+            with open(self._partition_file(key, False), "w", encoding="utf-8") as f:
+                json.dump(records, f, indent=4)
+
+    @staticmethod
+    def _manifest_entry(records: List[Dict[str, Any]], compressed: bool) -> Dict[str, Any]:
+        moments = [parse_utc(r["finished_at_utc"]) for r in records]
+        return {
+            "count": len(records),
+            "min_finished_at_utc": min(moments).isoformat(),
+            "max_finished_at_utc": max(moments).isoformat(),
+            "compressed": compressed,
+        }
+
+    def add(self, records: List[Dict[str, Any]]) -> bool:
+        """Merges records into their month partitions (by finished_at_utc) and updates the manifest."""
+        if not records:
+            return True
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            key = month_key(parse_utc(record["finished_at_utc"]))
+            grouped.setdefault(key, []).append(record)
+
+        manifest = self.load_manifest()
+
+        # Read every touched partition before writing any: one unreadable partition aborts the roll.
+        existing_by_key: Dict[str, List[Dict[str, Any]]] = {}
+        for key in grouped:
+            entry = manifest.get(key)
+            if entry is None:
+                existing_by_key[key] = []
+                continue
+            try:
+                existing_by_key[key] = self._read_partition_strict(key, bool(entry.get("compressed")))
+            except (OSError, EOFError, ValueError) as e:
+                print(f"❌ Archive partition {key} is unreadable, nothing was archived: {e}")
+                return False
+
+        try:
+            os.makedirs(self.archive_dir, exist_ok=True)
+
+            for key, new_records in grouped.items():
+                entry = manifest.get(key)
+                compressed = bool(entry and entry.get("compressed"))
+                existing = existing_by_key[key]
+
+                # Re-running an interrupted roll must not duplicate orders.
+                seen = {(r.get("customer_name"), r.get("finished_at_utc")) for r in existing}
+                merged = existing + [
+                    r for r in new_records
+                    if (r.get("customer_name"), r.get("finished_at_utc")) not in seen
+                ]
+                merged.sort(key=lambda r: parse_utc(r["finished_at_utc"]))
+
+                self._write_partition(key, merged, compressed)
+                manifest[key] = self._manifest_entry(merged, compressed)
+
+            self._save_manifest(manifest)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"❌ Error writing order archive: {e}")
+            return False
+
+    def compress_cold(self, now: datetime) -> int:
+        """Gzips partitions older than the hot window. Returns how many were compressed."""
+        manifest = self.load_manifest()
+        newest_cold = _month_number(month_key(now)) - self.hot_months - 1
+        compressed_count = 0
+
+        for key, entry in manifest.items():
+            if entry.get("compressed") or _month_number(key) > newest_cold:
+                continue
+
+            try:
+                records = self._read_partition_strict(key, False)
+                self._write_partition(key, records, True)
+                # Record the .gz in the manifest before the .json goes away, so a failure
+                # in between leaves a stray file rather than an unreachable partition.
+                entry["compressed"] = True
+                self._save_manifest(manifest)
+            except (OSError, EOFError, ValueError) as e:
+                entry["compressed"] = False
+                print(f"❌ Archive partition {key} could not be compressed, left as is: {e}")
+                continue
+
+            compressed_count += 1
+            try:
+                os.remove(self._partition_file(key, False))
+            except OSError as e:
+                print(f"⚠️ Could not remove uncompressed copy of partition {key}: {e}")
+
+        return compressed_count
+
+    def query(self, start: Optional[datetime], end: Optional[datetime]) -> List[Dict[str, Any]]:
+        """Orders with start <= finished_at_utc < end, opening only the overlapping partitions."""
+        results: List[Dict[str, Any]] = []
+
+        for key, entry in sorted(self.load_manifest().items()):
+            if start is not None and parse_utc(entry["max_finished_at_utc"]) < start:
+                continue
+            if end is not None and parse_utc(entry["min_finished_at_utc"]) >= end:
+                continue
+
+            for record in self._read_partition(key, bool(entry.get("compressed"))):
+                moment = parse_utc(record["finished_at_utc"])
+                if (start is None or moment >= start) and (end is None or moment < end):
+                    results.append(record)
+
+        return results
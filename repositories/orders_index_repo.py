@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import List, Dict, Any, Iterable
+
+from models.product import name_key
+from repositories.order_archive_repo import month_key, parse_utc
+
+INDEX_FIELDS = ("customers", "products")
+
+# Kept once per order, so lookups never have to open the order store.
+SUMMARY_FIELDS = ("order_id", "customer_name", "status", "total", "finished_at_utc")
+
+
+def order_ref(record: Dict[str, Any]) -> str:
+    """Stable identity of an order record. Legacy records without an id fall back to their timestamp."""
+    return record.get("order_id") or record["finished_at_utc"]
+
+
+class OrdersIndexRepository:
+    """
+    Reads/writes orders_index.jsonl: an append-only log with one line per order
+    (ref, month, summary fields, customer key, product keys).
+    In memory it becomes customer/product key -> refs and ref -> summary, so appending
+    an order costs the size of that order and a lookup costs the size of its result.
+    No business rules here.
+    """
+
+    def __init__(self, base_dir: str) -> None:
+        self.index_file = os.path.join(base_dir, "orders_index.jsonl")
+        self._refs: Dict[str, Dict[str, List[str]]] = {field: {} for field in INDEX_FIELDS}
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+
+    def exists(self) -> bool:
+        return os.path.exists(self.index_file)
+
+    @staticmethod
+    def _entry(record: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {field: record[field] for field in SUMMARY_FIELDS if field in record}
+        entry["ref"] = order_ref(record)
+        entry["month"] = month_key(parse_utc(record["finished_at_utc"]))
+
+        customer = record.get("customer_name")
+        entry["customers"] = [name_key(customer)] if customer else []
+        entry["products"] = sorted(
+            {name_key(item["name"]) for item in record.get("items", []) if item.get("name")}
+        )
+        return entry
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        ref = entry["ref"]
+        if ref in self._summaries:
+            return
+
+        self._summaries[ref] = {k: v for k, v in entry.items() if k not in INDEX_FIELDS}
+        for field in INDEX_FIELDS:
+            for key in entry.get(field, []):
+                self._refs[field].setdefault(key, []).append(ref)
+
+    def _reset(self) -> None:
+        self._refs = {field: {} for field in INDEX_FIELDS}
+        self._summaries = {}
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.exists():
+            return
+
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        self._apply(json.loads(line))
+                    except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+                        print(f"❌ Skipping order index line #{line_no}: {e}")
+        except OSError as e:
+            print(f"❌ Error reading order index: {e}")
+
+    def _write(self, entries: List[Dict[str, Any]], mode: str) -> bool:
+        try:
+            with open(self.index_file, mode, encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            return True
+        except (OSError, TypeError) as e:
+            print(f"❌ Error saving order index: {e}")
+            return False
+
+    def add(self, order_record: Dict[str, Any]) -> None:
+        self.add_many([order_record])
+
+    def add_many(self, order_records: Iterable[Dict[str, Any]]) -> None:
+        self.load()
+        entries = [self._entry(record) for record in order_records]
+        if self._write(entries, "a"):
+            for entry in entries:
+                self._apply(entry)
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> int:
+        entries = [self._entry(record) for record in records if record.get("finished_at_utc")]
+        self._reset()
+        self._loaded = True
+        if self._write(entries, "w"):
+            for entry in entries:
+                self._apply(entry)
+        return len(entries)
+
+    def lookup(self, field: str, name: str) -> List[Dict[str, Any]]:
+        self.load()
+        return [dict(self._summaries[ref]) for ref in self._refs[field].get(name_key(name), [])]
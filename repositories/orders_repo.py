@@ -23,13 +23,27 @@ class OrdersRepository:
             print(f"❌ Error reading orders: {e}")
             return []
 
-    def append(self, order_record: Dict[str, Any]) -> None:
-        orders = self.load()
-        orders.append(order_record)
-
+    def save(self, orders: List[Dict[str, Any]]) -> bool:
+        """Replace the whole order history (used when rolling orders into the archive)."""
         try:
             with open(self.orders_file, "w", encoding="utf-8") as f:
                 json.dump(orders, f, indent=4)
-            print("🧾 Order saved to history (orders.json).")
+            return True
         except (OSError, TypeError) as e:
             print(f"❌ Error saving order history: {e}")
+            return False
+
+    def append(self, order_record: Dict[str, Any]) -> bool:
+        return self.extend([order_record])
+
+    def extend(self, order_records: List[Dict[str, Any]]) -> bool:
+        orders = self.load()
+        orders.extend(order_records)
+
+        if not self.save(orders):
+            return False
+        if len(order_records) == 1:
+            print("🧾 Order saved to history (orders.json).")
+        else:
+            print(f"🧾 {len(order_records)} orders saved to history (orders.json).")
+        return True
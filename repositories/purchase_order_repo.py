@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import Any, List, Tuple
+
+
+def _quantity(value: Any) -> int:
+    """Whole-number quantity from JSON (int) or CSV (text). Bools and fractions are rejected."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"quantity must be a whole number, got {value!r}")
+    return int(value)
+
+
+class PurchaseOrderRepository:
+    """
+    Reads purchase-order files: a list of (product name, quantity) restock lines.
+    Accepts JSON ([{"name": ..., "quantity": ...}, ...]) or CSV with name,quantity columns.
+    No business rules here.
+    """
+
+    def load(self, path: str) -> List[Tuple[str, int]]:
+        if not os.path.exists(path):
+            print(f"❌ Purchase order not found: {path}")
+            return []
+
+        try:
+            if path.lower().endswith(".json"):
+                with open(path, "r", encoding="utf-8") as f:
+                    rows = json.load(f)
+                if not isinstance(rows, list):
+                    print("❌ Purchase order JSON must be a list. Ignoring.")
+                    return []
+            else:
+                # utf-8-sig: spreadsheet exports (Excel) start with a BOM.
+                with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                    rows = list(csv.DictReader(f))
+        except (OSError, json.JSONDecodeError, csv.Error) as e:
+            print(f"❌ Error reading purchase order: {e}")
+            return []
+
+        lines: List[Tuple[str, int]] = []
+        for idx, row in enumerate(rows, start=1):
+            try:
+                lines.append((str(row["name"]).strip(), _quantity(row["quantity"])))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"❌ Skipping purchase order line #{idx}: {row}")
+                print(f"   Reason: {e}")
+
+        return lines
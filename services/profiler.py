@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import cProfile
+import glob
+import io
+import json
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+PROFILE_ENV_VAR = "PYSTORE_PROFILE"
+
+# Frames from the profiling machinery itself are noise in allocation summaries.
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+
+class CommandProfiler:
+    """
+    Opt-in per-command profiling for the CLI.
+    Each wrapped call writes a cProfile dump (.prof) and a tracemalloc summary (.alloc.json)
+    into a per-session directory. When disabled, calls pass straight through.
+    """
+
+    def __init__(self, output_dir: Optional[str], top: int = 10) -> None:
+        self.enabled = bool(output_dir)
+        self.top = top
+        self.session_dir = ""
+        self._seq = 0
+
+        if output_dir:
+            # Microseconds + PID keep concurrent or back-to-back sessions apart.
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+            self.session_dir = os.path.join(output_dir, f"session-{stamp}-{os.getpid()}")
+            os.makedirs(self.session_dir, exist_ok=True)
+            print(f"⏱️ Profiling enabled. Writing to {self.session_dir}")
+
+    def call(self, command: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if not self.enabled:
+            return func(*args, **kwargs)
+
+        self._seq += 1
+        safe_name = re.sub(r"[^\w-]", "_", command)
+        prefix = os.path.join(self.session_dir, f"{self._seq:04d}-{safe_name}")
+
+        profile = cProfile.Profile()
+        # Leave tracing on afterwards if someone else (e.g. PYTHONTRACEMALLOC) started it.
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            try:
+                profile.dump_stats(f"{prefix}.prof")
+            except OSError as e:
+                print(f"❌ Error writing profile: {e}")
+            self._write_alloc_summary(f"{prefix}.alloc.json", command, elapsed, peak, snapshot)
+
+    def _write_alloc_summary(
+        self, path: str, command: str, elapsed: float, peak: int, snapshot: tracemalloc.Snapshot
+    ) -> None:
+        summary = {
+            "command": command,
+            "seconds": elapsed,
+            "peak_kb": peak / 1024,
+            "top_allocations": [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_kb": stat.size / 1024,
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[: self.top]
+            ],
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=4)
+        except OSError as e:
+            print(f"❌ Error writing allocation summary: {e}")
+
+
+def profiler_from_env(output_dir: Optional[str] = None) -> CommandProfiler:
+    """An explicit directory (CLI flag) wins over the PYSTORE_PROFILE environment variable."""
+    return CommandProfiler(output_dir or os.environ.get(PROFILE_ENV_VAR))
+
+
+def latest_session(profile_dir: str) -> str:
+    """Accepts a session directory, or a profile root (picks its newest session)."""
+    sessions = sorted(glob.glob(os.path.join(profile_dir, "session-*")))
+    return sessions[-1] if sessions else profile_dir
+
+
+def aggregate_session(session_dir: str, top: int = 15) -> str:
+    """Merges every profile and allocation summary of a session into one text report."""
+    prof_files = sorted(glob.glob(os.path.join(session_dir, "*.prof")))
+    alloc_files = sorted(glob.glob(os.path.join(session_dir, "*.alloc.json")))
+    if not prof_files:
+        return f"ℹ️ No profiles found in {session_dir}."
+
+    lines: List[str] = [f"📊 Profile report for {session_dir} ({len(prof_files)} command(s))"]
+
+    per_command: Dict[str, Dict[str, float]] = {}
+    allocations: Dict[str, Dict[str, float]] = {}
+    for path in alloc_files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                summary = json.load(f)
+            command = summary["command"]
+            seconds = float(summary["seconds"])
+            peak_kb = float(summary["peak_kb"])
+            top_allocations = [
+                (alloc["location"], float(alloc["size_kb"]), int(alloc["count"]))
+                for alloc in summary["top_allocations"]
+            ]
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            print(f"❌ Skipping {path}: {e}")
+            continue
+
+        stats = per_command.setdefault(command, {"calls": 0, "seconds": 0.0, "peak_kb": 0.0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["peak_kb"] = max(stats["peak_kb"], peak_kb)
+
+        for location, size_kb, count in top_allocations:
+            totals = allocations.setdefault(location, {"size_kb": 0.0, "count": 0})
+            totals["size_kb"] += size_kb
+            totals["count"] += count
+
+    lines.append("-" * 50)
+    lines.append("Commands (by total time):")
+    for command, stats in sorted(per_command.items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+        lines.append(
+            f"  {command} | Calls: {stats['calls']:.0f} | Total: {stats['seconds']:.4f}s | "
+            f"Peak: {stats['peak_kb']:.1f} KiB"
+        )
+
+    lines.append("-" * 50)
+    lines.append("Top allocation sites (summed across commands):")
+    ranked = sorted(allocations.items(), key=lambda kv: kv[1]["size_kb"], reverse=True)
+    for location, totals in ranked[:top]:
+        lines.append(f"  {location} | {totals['size_kb']:.1f} KiB | {totals['count']:.0f} blocks")
+
+    lines.append("-" * 50)
+    lines.append("Hot functions (cumulative time):")
+    out = io.StringIO()
+    merged: Optional[pstats.Stats] = None
+    for path in prof_files:
+        try:
+            if merged is None:
+                merged = pstats.Stats(path, stream=out)
+            else:
+                merged.add(path)
+        except Exception as e:  # pstats raises whatever marshal/unpickling hits on a bad file
+            print(f"❌ Skipping {path}: {e}")
+
+    if merged is None:
+        lines.append("ℹ️ No readable profiles.")
+    else:
+        merged.sort_stats("cumulative").print_stats(top)
+        lines.append(out.getvalue())
+
+    return "\n".join(lines)
@@ -1,12 +1,32 @@
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
 
 from models.catalog import Catalog
 from models.order import Order
 from models.product import Product
 from repositories.inventory_repo import InventoryRepository, default_seed_products
+from repositories.order_archive_repo import OrderArchiveRepository, parse_utc
+from repositories.orders_index_repo import OrdersIndexRepository
 from repositories.orders_repo import OrdersRepository
+from repositories.purchase_order_repo import PurchaseOrderRepository
+
+CLOSED_STATUSES = ("PAID", "CANCELED")
+
+# Cart views render at most this many lines; large B2B carts would otherwise print every line.
+CART_VIEW_LIMIT = 50
+
+
+def _finished_at(order: Dict[str, Any]) -> Optional[datetime]:
+    """finished_at_utc as a datetime, or None (reported) when it is missing or malformed."""
+    finished = order.get("finished_at_utc")
+    try:
+        return parse_utc(finished)
+    except (TypeError, ValueError):
+        print(f"❌ Skipping order with invalid finished_at_utc: {finished!r} "
+              f"({order.get('customer_name', 'Unknown')})")
+        return None
 
 
 class StoreService:
@@ -15,13 +35,28 @@ class StoreService:
     Keeps main.py small and keeps models/repositories focused.
     """
 
-    def __init__(self, inventory_repo: InventoryRepository, orders_repo: OrdersRepository):
+    def __init__(
+        self,
+        inventory_repo: InventoryRepository,
+        orders_repo: OrdersRepository,
+        archive_repo: Optional[OrderArchiveRepository] = None,
+        index_repo: Optional[OrdersIndexRepository] = None,
+        purchase_order_repo: Optional[PurchaseOrderRepository] = None,
+    ):
         """ Initi inventary"""
         self.inventory_repo = inventory_repo
         self.orders_repo = orders_repo
+        self.archive_repo = archive_repo
+        self.index_repo = index_repo
+        self.purchase_order_repo = purchase_order_repo or PurchaseOrderRepository()
         self.catalog = Catalog()
         self.current_order: Optional[Order] = None
 
+        # Batch mode turns this on and calls flush() itself instead of saving after every change.
+        self.defer_persistence = False
+        self._inventory_dirty = False
+        self._pending_orders: List[Dict[str, Any]] = []
+
     def bootstrap_catalog(self) -> None:
         products = self.inventory_repo.load()
 
@@ -40,77 +75,287 @@ class StoreService:
     def list_catalog(self) -> List[Product]:
         return list(self.catalog)
 
-    def start_order(self, customer_name: str) -> None:
+    def start_order(self, customer_name: str) -> bool:
         if self.current_order and self.current_order.status == "OPEN":
             print(
                 f"⚠️ There is already an open order for {self.current_order.customer_name}.")
             print("   Finish it, cancel it, or view the cart.")
-            return
+            return False
 
         name = customer_name.strip()
         if not name:
             print("❌ Customer name cannot be empty.")
-            return
+            return False
 
         self.current_order = Order(name)
         print(f"\n✅ Order started for {name}!")
+        return True
 
-    def show_cart(self) -> None:
+    def show_cart(self, limit: Optional[int] = CART_VIEW_LIMIT) -> None:
         if not self.current_order:
             print("⚠️ No open order.")
             return
-        print(self.current_order.summary())
+        print(self.current_order.summary(limit))
 
-    def add_item_by_index(self, product_index: int, qty: int) -> None:
+    def add_item_by_index(self, product_index: int, qty: int) -> bool:
         if not self.current_order:
             print("⚠️ Create an order first.")
-            return
+            return False
         if self.current_order.status != "OPEN":
             print("❌ You cannot modify a closed order.")
-            return
+            return False
 
         if not (0 <= product_index < len(self.catalog)):
             print("❌ Invalid product.")
-            return
+            return False
 
         product = self.catalog.get(product_index)
-        self.current_order.cart.add_item(product, qty)
-        self.inventory_repo.save(self.list_catalog())
+        added = self.current_order.cart.add_item(product, qty)
+        if added:
+            self._save_inventory()
+        return added
 
-    def remove_item_from_cart(self, cart_index: int, qty: int | None) -> None:
+    def add_items_by_index(self, lines: List[Tuple[int, int]]) -> bool:
+        """Bulk add of (product_index, qty) lines with a single inventory save."""
+        if not self.current_order:
+            print("⚠️ Create an order first.")
+            return False
+        if self.current_order.status != "OPEN":
+            print("❌ You cannot modify a closed order.")
+            return False
+
+        invalid = [idx for idx, _ in lines if not (0 <= idx < len(self.catalog))]
+        if invalid:
+            print(f"❌ Invalid product(s): {', '.join(str(idx + 1) for idx in invalid)}")
+            return False
+
+        added = self.current_order.cart.add_items(
+            (self.catalog.get(idx), qty) for idx, qty in lines
+        )
+        if added:
+            self._save_inventory()
+        return added
+
+    def remove_item_from_cart(self, cart_index: int, qty: int | None) -> bool:
         if not self.current_order:
             print("⚠️ No open order.")
-            return
+            return False
         if self.current_order.status != "OPEN":
             print("❌ You cannot modify a closed order.")
-            return
+            return False
         if self.current_order.cart.is_empty():
             print("🛒 Cart is empty.")
-            return
+            return False
 
-        self.current_order.cart.remove_item(cart_index, qty)
-        self.inventory_repo.save(self.list_catalog())
+        removed = self.current_order.cart.remove_item(cart_index, qty)
+        if removed:
+            self._save_inventory()
+        return removed
 
-    def cancel_current_order(self) -> None:
+    def cancel_current_order(self) -> bool:
         if not self.current_order:
             print("⚠️ No open order.")
-            return
+            return False
 
         self.current_order.cancel()
-        self.inventory_repo.save(self.list_catalog())
+        self._save_inventory()
         self.current_order = None
+        return True
 
-    def checkout_current_order(self) -> None:
+    def checkout_current_order(self) -> bool:
         if not self.current_order:
             print("⚠️ No order to finish.")
-            return
+            return False
 
         self.current_order.finish_order()
-        if self.current_order.status == "PAID":
-            self.orders_repo.append(self.current_order.to_record())
-            self.inventory_repo.save(self.list_catalog())
-            self.current_order = None
+        if self.current_order.status != "PAID":
+            return False
+
+        if not self._record_order(self.current_order.to_record()):
+            # Nothing was written; reopen so the checkout can be retried.
+            self.current_order.status = "OPEN"
+            print("❌ Order could not be saved. It is still open, try checkout again.")
+            return False
+
+        self._save_inventory()
+        self.current_order = None
+        return True
+
+    def restock_by_index(self, product_index: int, qty: int) -> bool:
+        if not (0 <= product_index < len(self.catalog)):
+            print("❌ Invalid product.")
+            return False
+        if not isinstance(qty, int) or qty <= 0:
+            print("❌ Quantity must be a positive integer.")
+            return False
+
+        product = self.catalog.get(product_index)
+        product += qty
+        print(f"📦 Restocked {qty}x {product.name}. Stock: {product.stock}")
+        self._save_inventory()
+        return True
+
+    def low_stock_products(self, limit: int = 10) -> List[Product]:
+        """Products at or below their reorder level, most urgent first."""
+        return self.catalog.low_stock(limit)
+
+    def replenish_from_file(self, path: str) -> int:
+        """Applies a whole purchase-order file of restocks with a single inventory save."""
+        lines = self.purchase_order_repo.load(path)
+        if not lines:
+            print("ℹ️ Nothing to restock.")
+            return 0
+
+        totals: Dict[Product, int] = {}
+        unknown: List[str] = []
+        for name, qty in lines:
+            product = self.catalog.find(name)
+            if product is None:
+                unknown.append(name)
+            elif qty <= 0:
+                print(f"❌ Skipping {name}: quantity must be positive.")
+            else:
+                totals[product] = totals.get(product, 0) + qty
+
+        for product, qty in totals.items():
+            product += qty
+
+        if unknown:
+            print(f"⚠️ Unknown product(s) skipped: {', '.join(unknown)}")
+        if not totals:
+            return 0
+
+        self._save_inventory()
+        print(f"📦 Replenished {len(totals)} product(s), {sum(totals.values())} unit(s).")
+        return len(totals)
 
     def order_history_latest(self, limit: int = 10) -> List[Dict[str, Any]]:
-        orders = self.orders_repo.load()
+        orders = self.orders_repo.load() + self._pending_orders
         return list(reversed(orders[-limit:]))
+
+    def _save_inventory(self) -> None:
+        if self.defer_persistence:
+            self._inventory_dirty = True
+            return
+        self.inventory_repo.save(self.list_catalog())
+
+    def _record_order(self, record: Dict[str, Any]) -> bool:
+        if self.defer_persistence:
+            self._pending_orders.append(record)
+            return True
+        if not self.orders_repo.append(record):
+            return False
+        self._index_orders([record])
+        return True
+
+    def _index_orders(self, records: List[Dict[str, Any]]) -> None:
+        """Call after the records are persisted."""
+        if self.index_repo is None:
+            return
+        # No index yet on a store with history: a full rebuild (which already sees these records).
+        if not self.index_repo.exists():
+            self.rebuild_order_indexes()
+        else:
+            self.index_repo.add_many(records)
+
+    def flush(self) -> bool:
+        """
+        Writes inventory and orders held back while defer_persistence is on.
+        If the orders cannot be written, nothing is flushed and everything stays pending,
+        so the stock on disk never reflects sales that are missing from orders.json.
+        """
+        if self._pending_orders:
+            if not self.orders_repo.extend(self._pending_orders):
+                return False
+            self._index_orders(self._pending_orders)
+            self._pending_orders = []
+
+        if self._inventory_dirty:
+            if not self.inventory_repo.save(self.list_catalog()):
+                return False
+            self._inventory_dirty = False
+        return True
+
+    def archive_closed_orders(self, now: Optional[datetime] = None) -> int:
+        """
+        Rolls closed orders finished before the current month out of orders.json
+        into the monthly archive, then compresses cold partitions.
+        """
+        if self.archive_repo is None:
+            print("⚠️ Order archive is not configured.")
+            return 0
+
+        now = now or datetime.now(timezone.utc)
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        to_archive: List[Dict[str, Any]] = []
+        to_keep: List[Dict[str, Any]] = []
+        for order in self.orders_repo.load():
+            finished = _finished_at(order)
+            if (
+                order.get("status") in CLOSED_STATUSES
+                and finished is not None
+                and finished < month_start
+            ):
+                to_archive.append(order)
+            else:
+                to_keep.append(order)
+
+        # Archive first: an interrupted roll leaves duplicates (skipped on retry), never lost orders.
+        if to_archive:
+            if not self.archive_repo.add(to_archive):
+                return 0
+            self.orders_repo.save(to_keep)
+
+        compressed = self.archive_repo.compress_cold(now)
+        print(f"📦 Archived {len(to_archive)} order(s). Compressed {compressed} partition(s).")
+        return len(to_archive)
+
+    def orders_between(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Orders finished in [start, end), from the archive and the live orders.json."""
+        results: List[Dict[str, Any]] = []
+        if self.archive_repo is not None:
+            results.extend(self.archive_repo.query(start, end))
+
+        for order in self.orders_repo.load():
+            moment = _finished_at(order)
+            if moment is None:
+                continue
+            if (start is None or moment >= start) and (end is None or moment < end):
+                results.append(order)
+
+        results.sort(key=lambda o: parse_utc(o["finished_at_utc"]))
+        return results
+
+    def rebuild_order_indexes(self) -> int:
+        """Rebuilds the customer/product indexes from the archive and orders.json."""
+        if self.index_repo is None:
+            print("⚠️ Order indexes are not configured.")
+            return 0
+
+        records = self.orders_between(None, None)
+        count = self.index_repo.rebuild(records)
+        print(f"🔎 Order indexes rebuilt from {count} order(s).")
+        return count
+
+    def orders_for_customer(self, customer_name: str) -> List[Dict[str, Any]]:
+        """Order summaries (order_id, customer_name, status, total, finished_at_utc) for a customer."""
+        return self._indexed_orders("customers", customer_name)
+
+    def orders_containing_product(self, product_name: str) -> List[Dict[str, Any]]:
+        """Order summaries for orders that contain the product."""
+        return self._indexed_orders("products", product_name)
+
+    def _indexed_orders(self, field: str, name: str) -> List[Dict[str, Any]]:
+        if self.index_repo is None:
+            print("⚠️ Order indexes are not configured.")
+            return []
+        if not self.index_repo.exists():
+            self.rebuild_order_indexes()
+
+        # Answered from the index entries alone; neither orders.json nor the archive is opened.
+        results = self.index_repo.lookup(field, name)
+        results.sort(key=lambda o: parse_utc(o["finished_at_utc"]))
+        return results
@@ -1,7 +1,25 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
 import unittest
+from datetime import datetime, timezone
 
-from models.product import PhysicalProduct, DigitalProduct
+from batch import parse_command, run_batch
+from models.cart import Cart
+from models.catalog import Catalog
+from models.product import Product, PhysicalProduct, DigitalProduct
 from models.order import Order
+from repositories.inventory_repo import InventoryRepository
+from repositories.order_archive_repo import OrderArchiveRepository
+from repositories.orders_index_repo import OrdersIndexRepository
+from repositories.orders_repo import OrdersRepository
+from repositories.purchase_order_repo import PurchaseOrderRepository
+from services.profiler import CommandProfiler, aggregate_session
+from services.store_service import StoreService
 
 
 class TestMainFunctions(unittest.TestCase):
@@ -32,5 +50,422 @@ class TestMainFunctions(unittest.TestCase):
         self.assertEqual(self.catalog[0].stock, start_stock - 2)
 
 
+def make_record(customer, finished_at_utc):
+    return {
+        "customer_name": customer,
+        "status": "PAID",
+        "created_at_utc": finished_at_utc,
+        "finished_at_utc": finished_at_utc,
+        "items": [{"name": "Book", "quantity": 1, "unit_price": 25.0, "subtotal": 25.0}],
+        "total": 25.0,
+    }
+
+
+class TestCart(unittest.TestCase):
+    def setUp(self):
+        self.phone = PhysicalProduct("Test Phone", 100.0, 5, 0.5)
+        self.ebook = DigitalProduct("Test Ebook", 10.0, 100, 5.0)
+        self.cart = Cart()
+
+    def test_lines_are_keyed_by_product_and_keep_insertion_order(self):
+        self.cart.add_item(self.phone, 1)
+        self.cart.add_item(self.ebook, 2)
+        self.cart.add_item(self.phone, 2)
+
+        self.assertEqual([item.product for item in self.cart.items], [self.phone, self.ebook])
+        self.assertEqual(self.cart.items[0].quantity, 3)
+        self.assertEqual(self.phone.stock, 2)
+
+    def test_add_items_is_all_or_nothing(self):
+        self.assertFalse(self.cart.add_items([(self.ebook, 1), (self.phone, 4), (self.phone, 2)]))
+        self.assertTrue(self.cart.is_empty())
+        self.assertEqual(self.ebook.stock, 100)
+
+        self.assertTrue(self.cart.add_items([(self.ebook, 1), (self.phone, 4), (self.ebook, 1)]))
+        self.assertEqual(len(self.cart), 2)
+        self.assertEqual(self.ebook.stock, 98)
+
+    def test_bool_quantities_are_rejected_everywhere(self):
+        self.assertFalse(self.cart.add_item(self.phone, True))
+        self.assertFalse(self.cart.add_items([(self.phone, True)]))
+        self.cart.add_item(self.phone, 2)
+        self.assertFalse(self.cart.remove_product(self.phone, True))
+        self.assertEqual(self.phone.stock, 3)
+
+    def test_order_summary_limits_rendered_lines(self):
+        order = Order("Big Buyer")
+        products = [DigitalProduct(f"Item {i}", 1.0, 10, 1.0) for i in range(5)]
+        order.cart.add_items([(p, 1) for p in products])
+
+        text = order.summary(limit=2)
+        self.assertIn("2. Item 1", text)
+        self.assertNotIn("Item 2 |", text)
+        self.assertIn("... and 3 more line(s).", text)
+
+    def test_remove_restores_stock_and_drops_line(self):
+        self.cart.add_items([(self.phone, 2), (self.ebook, 3)])
+        self.assertTrue(self.cart.remove_item(0))
+        self.assertTrue(self.cart.remove_product(self.ebook, 3))
+
+        self.assertTrue(self.cart.is_empty())
+        self.assertEqual((self.phone.stock, self.ebook.stock), (5, 100))
+
+
+class TestOrderArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base_dir = self.tmp.name
+        self.orders_repo = OrdersRepository(base_dir)
+        self.archive_repo = OrderArchiveRepository(base_dir)
+        self.store = StoreService(InventoryRepository(base_dir), self.orders_repo, self.archive_repo)
+        self.orders_repo.save(
+            [
+                make_record("Ana", "2026-01-10T10:00:00+00:00"),
+                make_record("Bruno", "2026-03-05T09:00:00"),
+                make_record("Carla", "2026-04-02T12:00:00+00:00"),
+            ]
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_archive_rolls_old_months_and_compresses_cold(self):
+        now = datetime(2026, 4, 15, tzinfo=timezone.utc)
+        self.assertEqual(self.store.archive_closed_orders(now), 2)
+
+        self.assertEqual([o["customer_name"] for o in self.orders_repo.load()], ["Carla"])
+        manifest = self.archive_repo.load_manifest()
+        self.assertTrue(manifest["2026-01"]["compressed"])
+        self.assertFalse(manifest["2026-03"]["compressed"])
+        self.assertEqual(manifest["2026-03"]["count"], 1)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.archive_repo.archive_dir, "orders-2026-01.json.gz"))
+        )
+
+    def test_range_query_spans_archive_and_live_orders(self):
+        self.store.archive_closed_orders(datetime(2026, 4, 15, tzinfo=timezone.utc))
+
+        start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        end = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        names = [o["customer_name"] for o in self.store.orders_between(start, end)]
+        self.assertEqual(names, ["Bruno", "Carla"])
+
+    def test_compress_failure_keeps_earlier_partitions_reachable(self):
+        self.orders_repo.save(
+            [make_record("Ana", "2025-01-10T10:00:00+00:00"), make_record("Bea", "2025-02-10T10:00:00+00:00")]
+        )
+        self.archive_repo.hot_months = 24
+        self.store.archive_closed_orders(datetime(2025, 3, 15, tzinfo=timezone.utc))
+        os.remove(os.path.join(self.archive_repo.archive_dir, "orders-2025-02.json"))
+
+        self.archive_repo.hot_months = 0
+        self.assertEqual(self.archive_repo.compress_cold(datetime(2025, 6, 1, tzinfo=timezone.utc)), 1)
+
+        manifest = self.archive_repo.load_manifest()
+        self.assertTrue(manifest["2025-01"]["compressed"])
+        self.assertFalse(manifest["2025-02"]["compressed"])
+        self.assertEqual([o["customer_name"] for o in self.archive_repo.query(None, None)], ["Ana"])
+
+    def test_malformed_timestamps_are_skipped(self):
+        orders = self.orders_repo.load()
+        orders.append(make_record("Broken", "yesterday"))
+        self.orders_repo.save(orders)
+
+        self.assertEqual(self.store.archive_closed_orders(datetime(2026, 4, 15, tzinfo=timezone.utc)), 2)
+        self.assertIn("Broken", [o["customer_name"] for o in self.orders_repo.load()])
+        names = [o["customer_name"] for o in self.store.orders_between(None, None)]
+        self.assertEqual(names, ["Ana", "Bruno", "Carla"])
+
+    def test_corrupted_partition_is_never_overwritten(self):
+        self.store.archive_closed_orders(datetime(2026, 4, 15, tzinfo=timezone.utc))
+        path = os.path.join(self.archive_repo.archive_dir, "orders-2026-03.json")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("garbage")
+        with open(path, "r", encoding="utf-8") as f:
+            corrupted = f.read()
+
+        self.assertFalse(self.archive_repo.add([make_record("Dora", "2026-03-20T10:00:00+00:00")]))
+        self.assertEqual(self.archive_repo.compress_cold(datetime(2026, 6, 1, tzinfo=timezone.utc)), 0)
+
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), corrupted)
+        self.assertEqual(self.archive_repo.load_manifest()["2026-03"]["count"], 1)
+
+
+class TestOrderIndexes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base_dir = self.tmp.name
+        self.orders_repo = OrdersRepository(base_dir)
+        self.store = StoreService(
+            InventoryRepository(base_dir),
+            self.orders_repo,
+            OrderArchiveRepository(base_dir),
+            OrdersIndexRepository(base_dir),
+        )
+        self.orders_repo.save(
+            [make_record("Ana", "2026-01-10T10:00:00+00:00"), make_record("Bruno", "2026-04-02T12:00:00")]
+        )
+        self.store.archive_closed_orders(datetime(2026, 4, 15, tzinfo=timezone.utc))
+        self.store.rebuild_order_indexes()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup_resolves_archived_and_live_orders(self):
+        self.assertEqual([o["customer_name"] for o in self.store.orders_for_customer(" ana ")], ["Ana"])
+        names = [o["customer_name"] for o in self.store.orders_containing_product("Book")]
+        self.assertEqual(names, ["Ana", "Bruno"])
+
+    def test_checkout_updates_indexes(self):
+        phone = PhysicalProduct("Test Phone", 100.0, 5, 0.5)
+        self.store.catalog.set_products([phone])
+        self.store.start_order("Carla")
+        self.store.add_item_by_index(0, 1)
+        self.store.checkout_current_order()
+
+        orders = self.store.orders_containing_product("test phone")
+        self.assertEqual([o["customer_name"] for o in orders], ["Carla"])
+        self.assertEqual(self.store.orders_for_customer("Nobody"), [])
+
+    def test_each_order_appends_one_index_line(self):
+        index_file = self.store.index_repo.index_file
+        with open(index_file, "r", encoding="utf-8") as f:
+            before = f.read()
+
+        self.store.catalog.set_products([Product(f"Item {i}", 1.0, 5) for i in range(3)])
+        self.store.start_order("Carla")
+        self.store.add_items_by_index([(0, 1), (1, 1), (2, 1)])
+        self.store.checkout_current_order()
+
+        with open(index_file, "r", encoding="utf-8") as f:
+            after = f.read()
+        self.assertTrue(after.startswith(before))
+        self.assertEqual(len(after[len(before):].splitlines()), 1)
+        self.assertEqual(len(OrdersIndexRepository(self.tmp.name).lookup("products", "item 2")), 1)
+
+    def test_lookup_does_not_open_the_order_store(self):
+        os.remove(self.orders_repo.orders_file)
+        shutil.rmtree(self.store.archive_repo.archive_dir)
+
+        orders = self.store.orders_containing_product("book")
+        self.assertEqual([(o["customer_name"], o["total"]) for o in orders], [("Ana", 25.0), ("Bruno", 25.0)])
+
+    def test_first_checkout_on_existing_history_indexes_everything(self):
+        with tempfile.TemporaryDirectory() as base_dir:
+            orders_repo = OrdersRepository(base_dir)
+            orders_repo.save([make_record("Ana", "2026-01-10T10:00:00"), make_record("Ana", "2026-02-10T10:00:00")])
+            index_repo = OrdersIndexRepository(base_dir)
+            store = StoreService(InventoryRepository(base_dir), orders_repo, None, index_repo)
+            store.catalog.set_products([PhysicalProduct("Test Phone", 100.0, 5, 0.5)])
+            self.assertFalse(index_repo.exists())
+
+            store.start_order("Ana")
+            store.add_item_by_index(0, 1)
+            store.checkout_current_order()
+
+            self.assertEqual(len(store.orders_for_customer("ana")), 3)
+            self.assertEqual(len(store.orders_containing_product("Book")), 2)
+
+
+class TestCommandProfiler(unittest.TestCase):
+    def test_profiles_each_call_and_aggregates_session(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = CommandProfiler(tmp)
+            self.assertEqual(profiler.call("sum_range", sum, range(1000)), 499500)
+
+            files = sorted(os.listdir(profiler.session_dir))
+            self.assertEqual(files, ["0001-sum_range.alloc.json", "0001-sum_range.prof"])
+            self.assertIn("sum_range | Calls: 1", aggregate_session(profiler.session_dir))
+
+    def test_sessions_do_not_collide_and_bad_files_are_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = CommandProfiler(tmp), CommandProfiler(tmp)
+            self.assertNotEqual(first.session_dir, second.session_dir)
+
+            first.call("sum_range", sum, range(10))
+            with open(os.path.join(first.session_dir, "0002-bad.alloc.json"), "w", encoding="utf-8") as f:
+                f.write('{"command": "bad"}')
+            with open(os.path.join(first.session_dir, "0002-bad.prof"), "wb") as f:
+                f.write(b"not a profile")
+
+            report = aggregate_session(first.session_dir)
+            self.assertIn("sum_range | Calls: 1", report)
+            self.assertNotIn("bad | Calls", report)
+
+    def test_write_errors_and_outer_tracing_do_not_break_the_call(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with contextlib.redirect_stdout(io.StringIO()):
+                profiler = CommandProfiler(tmp)
+            shutil.rmtree(profiler.session_dir)
+
+            tracemalloc.start()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()) as messages:
+                    self.assertEqual(profiler.call("max", max, 3, 7), 7)
+                self.assertTrue(tracemalloc.is_tracing())
+            finally:
+                tracemalloc.stop()
+            self.assertIn("❌ Error writing profile", messages.getvalue())
+
+    def test_disabled_profiler_passes_through(self):
+        profiler = CommandProfiler(None)
+        self.assertFalse(profiler.enabled)
+        self.assertEqual(profiler.call("max", max, 3, 7), 7)
+
+
+class TestBatchMode(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base_dir = self.tmp.name
+        self.inventory_repo = InventoryRepository(base_dir)
+        self.orders_repo = OrdersRepository(base_dir)
+        self.store = StoreService(self.inventory_repo, self.orders_repo)
+        self.store.catalog.set_products([PhysicalProduct("Test Phone", 100.0, 5, 0.5)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_runs_text_and_jsonl_commands_and_flushes_once(self):
+        source = io.StringIO(
+            'start_order "Ana Maria"\n'
+            '{"cmd": "add_item", "product": 1, "qty": 2}\n'
+            "add_item 9 1\n"
+            "checkout\n"
+        )
+        out = io.StringIO()
+
+        failures = run_batch(self.store, source, out)
+
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["ok"] for r in results], [True, True, False, True])
+        self.assertEqual(failures, 1)
+        self.assertEqual(self.orders_repo.load()[0]["customer_name"], "Ana Maria")
+        self.assertEqual(self.inventory_repo.load()[0].stock, 3)
+        self.assertFalse(self.store.defer_persistence)
+
+    def test_failed_order_write_keeps_everything_pending_and_fails_the_batch(self):
+        os.mkdir(self.orders_repo.orders_file)  # a directory: every write to orders.json fails
+        out = io.StringIO()
+        source = io.StringIO("start_order A\nadd_item 1 1\ncheckout\n")
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            failures = run_batch(self.store, source, out)
+
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(failures, 1)
+        self.assertEqual(results[-1]["cmd"], "flush")
+        self.assertFalse(results[-1]["ok"])
+        self.assertEqual(len(self.store._pending_orders), 1)
+        self.assertFalse(self.inventory_repo.exists())
+
+    def test_checkout_reopens_order_when_it_cannot_be_saved(self):
+        os.mkdir(self.orders_repo.orders_file)
+        self.store.start_order("A")
+        self.store.add_item_by_index(0, 1)
+
+        self.assertFalse(self.store.checkout_current_order())
+        self.assertEqual(self.store.current_order.status, "OPEN")
+
+    def test_commands_run_through_the_profiler(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()):
+            profiler = CommandProfiler(self.tmp.name)
+        run_batch(self.store, io.StringIO("catalog\n"), out, run=profiler.call)
+
+        self.assertEqual(json.loads(out.getvalue())["cmd"], "catalog")
+        self.assertIn("0001-catalog.prof", os.listdir(profiler.session_dir))
+
+    def test_arguments_are_validated_before_dispatch(self):
+        bad = [
+            '{"cmd": "add_item", "product": 1.9, "qty": true}',
+            '{"cmd": "add_items", "lines": [[1, false]]}',
+            "add_item 1",
+            "add_item one 2",
+        ]
+        for line in bad:
+            with self.subTest(line=line):
+                with self.assertRaises(ValueError):
+                    parse_command(line)
+
+        self.assertEqual(parse_command("remove_item 2"), ("remove_item", [2]))
+        self.assertEqual(parse_command('{"cmd": "add_item", "args": [1, 2]}'), ("add_item", [1, 2]))
+
+    def test_service_bugs_are_reported_as_internal_errors(self):
+        self.store.list_catalog = lambda: 1 / 0
+        out = io.StringIO()
+        run_batch(self.store, io.StringIO("catalog\n"), out)
+        result = json.loads(out.getvalue())
+        self.assertFalse(result["ok"])
+        self.assertIn("ZeroDivisionError", result["internal_error"])
+
+    def test_unknown_command_is_reported(self):
+        out = io.StringIO()
+        run_batch(self.store, io.StringIO("explode now\n"), out)
+        result = json.loads(out.getvalue())
+        self.assertFalse(result["ok"])
+        self.assertIn("Unknown command", result["error"])
+
+
+class TestLowStockAndReplenishment(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.inventory_repo = InventoryRepository(self.tmp.name)
+        self.store = StoreService(self.inventory_repo, OrdersRepository(self.tmp.name))
+        self.products = [Product("Banana", 1.0, 20), Product("Book", 5.0, 3), Product("Pen", 1.0, 0)]
+        self.store.catalog.set_products(self.products)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_low_stock_follows_stock_changes(self):
+        banana, book, pen = self.products
+        self.assertEqual(self.store.low_stock_products(), [pen, book])
+
+        banana.stock = 1
+        pen += 30
+        book.reorder_level = 2
+        self.assertEqual(self.store.low_stock_products(), [banana])
+        self.assertEqual(self.store.low_stock_products(limit=0), [])
+
+    def test_catalog_index_tracks_cart_reservations(self):
+        catalog = Catalog([Product("Lamp", 10.0, 6)])
+        cart = Cart()
+        cart.add_item(catalog.get(0), 2)
+        self.assertEqual([p.name for p in catalog.low_stock()], ["Lamp"])
+
+    def test_purchase_order_rejects_bool_and_fractional_quantities(self):
+        path = os.path.join(self.tmp.name, "po.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                [
+                    {"name": "Pen", "quantity": True},
+                    {"name": "Pen", "quantity": 2.7},
+                    {"name": "Book", "quantity": 4},
+                ],
+                f,
+            )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(PurchaseOrderRepository().load(path), [("Book", 4)])
+
+    def test_purchase_order_csv_with_bom(self):
+        path = os.path.join(self.tmp.name, "po.csv")
+        with open(path, "w", encoding="utf-8-sig") as f:
+            f.write("name,quantity\nPen,10\n")
+
+        self.assertEqual(PurchaseOrderRepository().load(path), [("Pen", 10)])
+
+    def test_replenish_applies_purchase_order_in_one_save(self):
+        path = os.path.join(self.tmp.name, "po.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("name,quantity\nPen,10\n book ,4\npen,5\nGhost,3\n")
+
+        self.assertEqual(self.store.replenish_from_file(path), 2)
+        stocks = {p.name: p.stock for p in self.inventory_repo.load()}
+        self.assertEqual(stocks, {"Banana": 20, "Book": 7, "Pen": 15})
+        self.assertEqual(self.store.low_stock_products(), [])
+
+
 if __name__ == "__main__":
     unittest.main()